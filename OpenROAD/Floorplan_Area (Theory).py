@@ -1,8 +1,17 @@
 import subprocess
 import re
 import math
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional, TextIO
+
+if TYPE_CHECKING:
+    # Only for annotations; numpy is imported at runtime by calc_corners_batch
+    import numpy as np
 
 class YosysAreaCalculator:
+    CHIP_AREA_RE = re.compile(r'Chip area for module.*?:\s*"?([\d.]+)"?')
+
     def __init__(self, liberty_path: str, design_path: str, top_module: str):
         self.liberty_path = liberty_path
         self.design_path = design_path
@@ -12,8 +21,9 @@ class YosysAreaCalculator:
         self.strap_offset = 2.0        # strap offset
         self.pdn_margin = 1.4         # safety margin for PDN routing
 
-    def execute_yosys_commands(self) -> str:
-        """Execute commands in Yosys and capture output."""
+    @contextmanager
+    def execute_yosys_commands(self) -> Iterator[TextIO]:
+        """Execute commands in Yosys and stream its output line by line."""
         commands = [
             f'read_liberty -lib -ignore_miss_dir -setattr blackbox "{self.liberty_path}"',
             f'read_verilog {self.design_path}',
@@ -43,23 +53,53 @@ class YosysAreaCalculator:
                                 stdin=subprocess.PIPE,
                                 stdout=subprocess.PIPE,
                                 stderr=subprocess.PIPE,
-                                text=True)
+                                text=True,
+                                bufsize=1)
 
         commands_str = '\n'.join(commands) + '\nexit\n'
-        stdout, stderr = process.communicate(commands_str)
+
+        # Feed commands and collect stderr in background threads so neither pipe
+        # blocks while the caller consumes stdout
+        def feed_commands():
+            try:
+                process.stdin.write(commands_str)
+                process.stdin.close()
+            except BrokenPipeError:
+                # Yosys exited early; the return code check reports it
+                pass
+
+        stderr_lines = []
+        writer = threading.Thread(target=feed_commands, daemon=True)
+        stderr_reader = threading.Thread(target=lambda: stderr_lines.extend(process.stderr),
+                                         daemon=True)
+        writer.start()
+        stderr_reader.start()
+
+        try:
+            yield process.stdout
+        finally:
+            # Drain whatever the caller did not read so Yosys can exit
+            for _ in process.stdout:
+                pass
+            writer.join()
+            stderr_reader.join()
+            process.wait()
 
         if process.returncode != 0:
-            raise Exception(f"Yosys execution failed:\n{stderr}")
+            raise Exception(f"Yosys execution failed:\n{''.join(stderr_lines)}")
 
-        return stdout
+    def extract_area(self, yosys_output: Iterable[str]) -> Optional[float]:
+        """Extract the raw chip area from the streamed Yosys output."""
+        # Stop scanning at the first chip area line
+        for line in yosys_output:
+            area_match = self.CHIP_AREA_RE.search(line)
+            if area_match:
+                return float(area_match.group(1))
+        return None
 
-    def extract_and_save_area(self, yosys_output: str) -> float:
-        """Extract area and save to chip.txt."""
-        pattern = r'Chip area for module.*?:\s*"?([\d.]+)"?'
-        area_match = re.search(pattern, yosys_output)
-        
-        if area_match:
-            area = float(area_match.group(1))
+    def save_area(self, area: Optional[float]) -> Optional[float]:
+        """Add the PDN margin to the area and save it to chip.txt."""
+        if area is not None:
             # Add PDN overhead to the area
             area = area * self.pdn_margin
             with open('chip.txt', 'w') as f:
@@ -112,12 +152,49 @@ class YosysAreaCalculator:
             }
         }
 
+    def calc_corners_batch(self, chip_area: "np.ndarray", util: "np.ndarray",
+                           core_util: "np.ndarray") -> dict:
+        """
+        Vectorized calculate_corner_points for design-space sweeps.
+        Inputs broadcast against each other; returns arrays of die side,
+        core side and core offset (the die corner is always at the origin).
+        """
+        # numpy is only needed for sweeps; the scalar flow stays stdlib-only
+        import numpy as np
+
+        chip_area, util, core_util = np.broadcast_arrays(
+            np.asarray(chip_area, dtype=np.float64),
+            np.asarray(util, dtype=np.float64),
+            np.asarray(core_util, dtype=np.float64))
+
+        core_area = (chip_area / util) * (1 + self.pdn_margin)
+        min_side_length = self.metal4_min_width + (2 * self.strap_offset)
+        die_area = np.maximum(core_area / core_util, min_side_length * min_side_length)
+        core_side = np.maximum(np.sqrt(core_area), min_side_length)
+        die_side = np.maximum(np.sqrt(die_area), core_side * 1.2)
+        core_offset = np.maximum((die_side - core_side) / 2, self.strap_offset)
+
+        # Verify PDN requirements are met for every point
+        insufficient = core_side < self.metal4_min_width
+        if np.any(insufficient):
+            failing = np.argwhere(insufficient)
+            raise ValueError(f"Core width insufficient for PDN requirements at "
+                             f"{len(failing)} point(s), first at index {tuple(failing[0])}")
+
+        return {
+            'die_side': die_side,
+            'core_side': core_side,
+            'core_offset': core_offset
+        }
+
     def run_flow(self, utilization: float = 0.6, core_utilization: float = 0.7) -> None:
         """Run the complete flow with PDN considerations."""
         try:
-            # Run Yosys and get chip area
-            yosys_output = self.execute_yosys_commands()
-            chip_area = self.extract_and_save_area(yosys_output)
+            # Run Yosys and get chip area; chip.txt is only written once Yosys
+            # has exited successfully
+            with self.execute_yosys_commands() as yosys_output:
+                raw_area = self.extract_area(yosys_output)
+            chip_area = self.save_area(raw_area)
             
             if chip_area is not None:
                 # Calculate corner points with PDN considerations
@@ -1,15 +1,45 @@
+import os
 import joblib
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from tkinter import ttk
 
+# Optional: compile tree ensembles to ONNX Runtime for faster inference
+try:
+    import onnxruntime as ort
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+except ImportError:
+    ort = None
+
 class AreaPredictionInterface:
+    # Model input features in training column order: (key, label, default)
+    FEATURES = [
+        ('total_cell_count', 'Total Cell Count', '1234'),
+        ('sequential_cells', 'Sequential Cells', '567'),
+        ('combinational_cells', 'Combinational Cells', '667'),
+        ('macro_count', 'Macro Count', '2'),
+        ('total_instances', 'Total Instances', '1236'),
+        ('memory_bits', 'Memory Bits', '8192'),
+        ('memory_instances', 'Memory Instances', '1'),
+        ('total_nets', 'Total Nets', '2345'),
+        ('total_pins', 'Total Pins', '4567'),
+        ('avg_fanout', 'Average Fanout', '3.7'),
+        ('utilization', 'Utilization', '0.7')
+    ]
+
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("Circuit Area Predictor")
         self.root.geometry("600x800")
         self.model = None
+        self._die_fn = None
+        self._core_fn = None
+        self._keys = [key for key, _, _ in self.FEATURES]
+        # Reused input row so single predictions don't allocate a new array
+        self._Xbuf = np.empty((1, len(self._keys)), dtype=np.float64)
         self.setup_ui()
 
     def setup_ui(self):
@@ -21,30 +51,17 @@ class AreaPredictionInterface:
         ttk.Button(main_frame, text="Load Trained Model", 
                   command=self.load_model).grid(row=0, column=0, pady=10)
 
-        # Feature input fields
-        self.feature_entries = {}
-        self.feature_vars = {}
+        # Feature input fields, kept in the same order as self._keys
+        self._entries = []
         
-        features = [
-            ('total_cell_count', 'Total Cell Count', '1234'),
-            ('sequential_cells', 'Sequential Cells', '567'),
-            ('combinational_cells', 'Combinational Cells', '667'),
-            ('macro_count', 'Macro Count', '2'),
-            ('total_instances', 'Total Instances', '1236'),
-            ('memory_bits', 'Memory Bits', '8192'),
-            ('memory_instances', 'Memory Instances', '1'),
-            ('total_nets', 'Total Nets', '2345'),
-            ('total_pins', 'Total Pins', '4567'),
-            ('avg_fanout', 'Average Fanout', '3.7'),
-            ('utilization', 'Utilization', '0.7')
-        ]
+        features = self.FEATURES
 
         for idx, (key, label, default) in enumerate(features):
             ttk.Label(main_frame, text=label).grid(row=idx+1, column=0, pady=2)
-            self.feature_vars[key] = tk.StringVar(value=default)
-            entry = ttk.Entry(main_frame, textvariable=self.feature_vars[key])
+            entry = ttk.Entry(main_frame)
+            entry.insert(0, default)
             entry.grid(row=idx+1, column=1, pady=2)
-            self.feature_entries[key] = entry
+            self._entries.append(entry)
 
         # Predict Button
         ttk.Button(main_frame, text="Predict Area", 
@@ -63,20 +80,90 @@ class AreaPredictionInterface:
             )
             if model_path:
                 self.model = joblib.load(model_path)
+                probe = self.get_probe_batch()
+                self._die_fn, die_backend = self.compile_predictor(self.model['model_die'], probe)
+                self._core_fn, core_backend = self.compile_predictor(self.model['model_core'], probe)
                 self.result_text.insert(tk.END, f"Model loaded successfully from: {model_path}\n")
+                self.result_text.insert(tk.END,
+                    f"Inference backend: die={die_backend}, core={core_backend}\n")
                 messagebox.showinfo("Success", "Model loaded successfully!")
         except Exception as e:
             messagebox.showerror("Error", f"Error loading model: {str(e)}")
 
+    def get_probe_batch(self):
+        """Scaled rows around the default feature values, used to validate compiled predictors"""
+        defaults = np.array([float(default) for _, _, default in self.FEATURES])
+        return self.model['scaler'].transform(np.outer([0.5, 1.0, 2.0], defaults))
+
+    def compile_predictor(self, estimator, probe):
+        """Return a predict callable and its backend name, using ONNX Runtime for tree ensembles"""
+        # Only ensembles gain from compilation; anything unsupported keeps sklearn's predict
+        if ort is None or not hasattr(estimator, 'estimators_'):
+            return estimator.predict, 'scikit-learn'
+        try:
+            onnx_model = convert_sklearn(
+                estimator,
+                initial_types=[('input', FloatTensorType([None, len(self._keys)]))])
+            # One intra-op thread per session: batch_predict already fans rows out
+            # across a thread per core, and ORT's default pool would oversubscribe
+            options = ort.SessionOptions()
+            options.intra_op_num_threads = 1
+            session = ort.InferenceSession(onnx_model.SerializeToString(),
+                                           sess_options=options,
+                                           providers=['CPUExecutionProvider'])
+            input_name = session.get_inputs()[0].name
+
+            # Match sklearn's output shape, e.g. (N,) rather than (N, 1) for one target
+            expected = estimator.predict(probe)
+            output_shape = expected.shape[1:]
+
+            def predict(X):
+                out = session.run(None, {input_name: np.asarray(X, dtype=np.float32)})[0]
+                return out.reshape((len(X),) + output_shape)
+
+            # ONNX thresholds are float32, so points near a split can fall in a
+            # different leaf; keep sklearn unless both backends agree on the probe
+            if not np.allclose(predict(probe), expected):
+                return estimator.predict, 'scikit-learn'
+        except Exception:
+            return estimator.predict, 'scikit-learn'
+
+        return predict, 'onnxruntime'
+
     def get_feature_values(self):
-        features = {}
-        for key, entry in self.feature_entries.items():
-            try:
-                value = float(self.feature_vars[key].get())
-                features[key] = value
-            except ValueError:
-                raise ValueError(f"Invalid value for {key}. Please enter a number.")
-        return features
+        """Read the entry fields into the preallocated input row"""
+        i = 0
+        try:
+            for i, entry in enumerate(self._entries):
+                self._Xbuf[0, i] = float(entry.get())
+        except ValueError:
+            raise ValueError(f"Invalid value for {self._keys[i]}. Please enter a number.")
+        return self._Xbuf
+
+    def require_model(self):
+        """Raise a clear error when no trained model has been loaded yet"""
+        if self.model is None:
+            raise RuntimeError("Please load a trained model first!")
+
+    def predict_many(self, X):
+        """Predict die and core corners for an (N, 11) feature array"""
+        self.require_model()
+        X_scaled = self.model['scaler'].transform(X)
+        die_corners = self._die_fn(X_scaled)
+        core_corners = self._core_fn(X_scaled)
+        return die_corners, core_corners
+
+    def batch_predict(self, X):
+        """Predict die and core corners for a large (N, 11) grid using worker threads"""
+        self.require_model()
+        X_scaled = self.model['scaler'].transform(X)
+        # Tree ensemble predict releases the GIL, so row chunks score in parallel
+        n_chunks = max(1, min(len(X_scaled), os.cpu_count() or 1))
+        chunks = np.array_split(X_scaled, n_chunks)
+        with ThreadPoolExecutor(max_workers=n_chunks) as executor:
+            die_corners = np.concatenate(list(executor.map(self._die_fn, chunks)))
+            core_corners = np.concatenate(list(executor.map(self._core_fn, chunks)))
+        return die_corners, core_corners
 
     def predict_area(self):
         if self.model is None:
@@ -85,29 +172,12 @@ class AreaPredictionInterface:
 
         try:
             # Get feature values
-            features = self.get_feature_values()
-            
-            # Prepare input features
-            X = np.array([[
-                features['total_cell_count'],
-                features['sequential_cells'],
-                features['combinational_cells'],
-                features['macro_count'],
-                features['total_instances'],
-                features['memory_bits'],
-                features['memory_instances'],
-                features['total_nets'],
-                features['total_pins'],
-                features['avg_fanout'],
-                features['utilization']
-            ]])
-
-            # Scale features
-            X_scaled = self.model['scaler'].transform(X)
+            X = self.get_feature_values()
             
-            # Make predictions
-            die_corners = self.model['model_die'].predict(X_scaled)[0]
-            core_corners = self.model['model_core'].predict(X_scaled)[0]
+            # Scale features and make predictions
+            die_batch, core_batch = self.predict_many(X)
+            die_corners = die_batch[0]
+            core_corners = core_batch[0]
 
             # Display results
             self.result_text.delete(1.0, tk.END)
@@ -1,29 +1,150 @@
 import os
+import sys
 import subprocess
 import re
 import json
+import hashlib
+import mmap
+import shutil
 import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from concurrent.futures import ProcessPoolExecutor
+
+# Optional: blake3 hashes large Liberty files much faster than hashlib's BLAKE2b
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+# Optional: orjson serializes the combined feature file much faster than json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+@dataclass(slots=True)
+class DesignFeatures:
+    """Extracted features for one design"""
+    design_name: str = ''
+    gate_count: int = 0
+    total_wire_length: int = 0
+    memory_bits: int = 0
+    standard_cells_count: int = 0
+    macro_count: int = 0
+    metal_layers: int = 0
+    power_domains: int = 1
+    voltage_domains: int = 1
+    io_pad_count: int = 0
+    chip_area: float = 0.0
+    combinational_area: float = 0.0
+    noncombinational_area: float = 0.0
+    buf_inv_area: float = 0.0
+    total_cell_area: float = 0.0
+
+@contextmanager
+def map_file(path):
+    """Memory-map a file read-only so it can be scanned without reading it into memory"""
+    with open(path, 'rb') as f:
+        # mmap cannot map an empty file
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
 
 class MultiDesignFeatureExtractor:
-    def __init__(self):
+    # Single alternation over the Yosys stat report; each named group is the
+    # feature key its value is stored under, so the log is scanned only once
+    YOSYS_STAT_RE = re.compile(
+        r'Number of cells:\s+(?P<gate_count>\d+)'
+        r'|Number of wires:\s+(?P<total_wire_length>\d+)'
+        r'|Memory bits:\s+(?P<memory_bits>\d+)'
+        r'|Chip area for top module.*?:\s*(?P<chip_area>[\d.]+)'
+        r'|Combinational area:\s*(?P<combinational_area>[\d.]+)'
+        r'|Noncombinational area:\s*(?P<noncombinational_area>[\d.]+)'
+        r'|Buf/Inv area:\s*(?P<buf_inv_area>[\d.]+)'
+        r'|Total cell area:\s*(?P<total_cell_area>[\d.]+)'
+    )
+
+    # Synthesis script; {output_dir} is the cache entry the outputs are written to.
+    # Both templates are part of the cache key, so editing a pass invalidates old results
+    YOSYS_SCRIPT = """
+    # Read Liberty file
+    read_liberty -lib -ignore_miss_dir -setattr blackbox "{liberty_file}"
+
+    # Read design
+    read_verilog {verilog_file}
+
+    # Set and check hierarchy
+    hierarchy -check -top {top_module}
+
+    # High-level synthesis
+    proc
+    fsm
+    opt
+    memory
+    opt
+
+    # Technology mapping
+    techmap
+    opt
+    dfflibmap -liberty {liberty_file}
+    opt
+    abc -liberty {liberty_file}
+
+    # Cleanup and finalization
+    flatten
+    setundef -zero
+    clean -purge
+    
+    # Map I/O pads
+    iopadmap -outpad BUF_X2 A:Z -bits
+    opt
+    clean
+
+    # Get statistics
+    stat -liberty {liberty_file}
+
+    # Rename
+    rename -enumerate
+    """
+
+    # Netlist, BLIF and diagram outputs, appended only when emit_artifacts is set
+    YOSYS_ARTIFACT_SCRIPT = """
+    # Write outputs
+    write_verilog -noattr {output_dir}/{top_module}_netlist.v
+    write_blif -buf BUF_X2 A Z {output_dir}/{top_module}_mapped_withbuf.blif
+
+    # Show design
+    show -stretch -prefix {output_dir}/{top_module}_diagram
+    """
+
+    # Bump to invalidate every cache entry, e.g. after a Yosys upgrade
+    CACHE_VERSION = 1
+
+    # Verilog `include directives, followed when hashing the design
+    INCLUDE_RE = re.compile(rb'`include\s+"([^"]+)"')
+
+    # Yosys reports failed commands on a line starting with ERROR:
+    YOSYS_ERROR_RE = re.compile(r'^ERROR:.*$', re.MULTILINE)
+
+    # LEF patterns (bytes, matched directly against the memory-mapped file).
+    # Macros and metal layers are counted in one pass; a macro is a standard
+    # cell when its name carries a drive-strength suffix such as _1X2
+    LEF_RE = re.compile(rb'MACRO\s+(?P<macro>\w+)|LAYER\s+metal\d+')
+    STD_CELL_NAME_RE = re.compile(rb'\w+_\d+X\d+')
+
+    # Liberty patterns
+    IO_PAD_RE = re.compile(rb'cell\s*\(\s*\w*pad\w*\s*\)')
+    POWER_DOMAINS_RE = re.compile(rb'power_domains\s*:\s*(\d+)')
+    VOLTAGE_DOMAINS_RE = re.compile(rb'voltage_domains\s*:\s*(\d+)')
+
+    def __init__(self, cache_dir="cache", emit_artifacts=False):
         self.all_features = {}
-        self.feature_template = {
-            'design_name': '',
-            'gate_count': 0,
-            'total_wire_length': 0,
-            'memory_bits': 0,
-            'standard_cells_count': 0,
-            'macro_count': 0,
-            'metal_layers': 0,
-            'power_domains': 1,
-            'voltage_domains': 1,
-            'io_pad_count': 0,
-            'chip_area': 0.0,
-            'combinational_area': 0.0,
-            'noncombinational_area': 0.0,
-            'buf_inv_area': 0.0,
-            'total_cell_area': 0.0
-        }
+        self.cache_dir = cache_dir
+        # Netlist, BLIF and diagram outputs are only needed outside feature extraction
+        self.emit_artifacts = emit_artifacts
 
     def get_initial_inputs(self):
         """Get number of designs and common files"""
@@ -67,149 +188,211 @@ class MultiDesignFeatureExtractor:
         design_name = os.path.splitext(os.path.basename(verilog_file))[0]
         return verilog_file, top_module, design_name
 
+    def get_included_files(self, verilog_file, top_file=None, found=None):
+        """Return Verilog files an `include may resolve to, in the order Yosys searches them"""
+        top_file = verilog_file if top_file is None else top_file
+        found = {} if found is None else found
+        with map_file(verilog_file) as content:
+            names = [m.group(1).decode() for m in self.INCLUDE_RE.finditer(content)]
+        for name in names:
+            # Yosys tries the path as given (relative to the working directory) and then
+            # relative to the file being read. Every existing candidate is hashed, so a
+            # change to whichever one Yosys picks changes the cache key
+            candidates = [name]
+            if not os.path.isabs(name):
+                candidates += [os.path.join(os.path.dirname(verilog_file), name),
+                               os.path.join(os.path.dirname(top_file), name)]
+            for candidate in candidates:
+                include_path = os.path.normpath(candidate)
+                if include_path not in found and os.path.isfile(include_path):
+                    found[include_path] = None
+                    self.get_included_files(include_path, top_file, found)
+        return list(found)
+
+    def get_cache_key(self, verilog_file, liberty_file, top_module):
+        """Hash the synthesis inputs so unchanged designs can reuse earlier results"""
+        h = blake3.blake3() if blake3 is not None else hashlib.blake2b(digest_size=16)
+        # The script templates decide which features come out, so they are inputs too
+        h.update(f"v{self.CACHE_VERSION}\0{self.YOSYS_SCRIPT}\0{self.YOSYS_ARTIFACT_SCRIPT}\0".encode())
+        for file_path in (verilog_file, liberty_file, *self.get_included_files(verilog_file)):
+            # Length-prefix each file so different splits of the same bytes hash differently,
+            # and hash in 1 MiB chunks so large Liberty files are never fully in memory
+            h.update(f"{os.path.getsize(file_path)}\0".encode())
+            with open(file_path, 'rb') as f:
+                while chunk := f.read(1 << 20):
+                    h.update(chunk)
+        h.update(top_module.encode())
+        return h.hexdigest()
+
+    def load_cached_features(self, cached_features_file):
+        """Load a cache entry's features, or return None when it is missing or unreadable"""
+        try:
+            with open(cached_features_file, 'r') as f:
+                return DesignFeatures(**json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as e:
+            # A damaged entry is just a miss; the rerun overwrites it
+            print(f"Ignoring unreadable cache entry {cached_features_file}: {e}")
+            return None
+
+    def publish_cache_entry(self, staging_dir, cache_path):
+        """Move a finished run's files into its cache entry, features.json last"""
+        os.makedirs(cache_path, exist_ok=True)
+        # os.replace is atomic within the cache directory, so readers only ever
+        # see complete files, and features.json appears only once the rest is in place
+        names = sorted(os.listdir(staging_dir), key=lambda name: name == 'features.json')
+        for name in names:
+            os.replace(os.path.join(staging_dir, name), os.path.join(cache_path, name))
+
+    def link_cached_outputs(self, cache_path, design_output_dir):
+        """Symlink cached synthesis outputs into the design output directory"""
+        # Drop links left by earlier runs so outputs of an older entry never look current
+        for name in os.listdir(design_output_dir):
+            link_path = os.path.join(design_output_dir, name)
+            if os.path.islink(link_path):
+                os.remove(link_path)
+        for name in os.listdir(cache_path):
+            # The entry's features.json holds whichever design first filled it;
+            # per-design features are in all_design_features.json instead
+            if name == 'features.json':
+                continue
+            link_path = os.path.join(design_output_dir, name)
+            if os.path.lexists(link_path):
+                os.remove(link_path)
+            os.symlink(os.path.abspath(os.path.join(cache_path, name)), link_path)
+
     def run_yosys_analysis(self, verilog_file, liberty_file, top_module, design_name):
-        """Run Yosys synthesis with specified commands"""
+        """Run Yosys synthesis with specified commands and return the design features"""
         print(f"\nProcessing Design: {design_name}")
         
         # Create output directory for this design
         design_output_dir = f"output/{design_name}"
         os.makedirs(design_output_dir, exist_ok=True)
 
-        # Create Yosys script
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.ys', delete=False) as tmp:
-            yosys_script = f"""
-            # Read Liberty file
-            read_liberty -lib -ignore_miss_dir -setattr blackbox "{liberty_file}"
-
-            # Read design
-            read_verilog {verilog_file}
-
-            # Set and check hierarchy
-            hierarchy -check -top {top_module}
-
-            # High-level synthesis
-            proc
-            fsm
-            opt
-            memory
-            opt
-
-            # Technology mapping
-            techmap
-            opt
-            dfflibmap -liberty {liberty_file}
-            opt
-            abc -liberty {liberty_file}
-
-            # Cleanup and finalization
-            flatten
-            setundef -zero
-            clean -purge
-            
-            # Map I/O pads
-            iopadmap -outpad BUF_X2 A:Z -bits
-            opt
-            clean
-
-            # Get statistics
-            stat -liberty {liberty_file}
-
-            # Rename and write outputs
-            rename -enumerate
-            write_verilog -noattr {design_output_dir}/{top_module}_netlist.v
-            write_blif -buf BUF_X2 A Z {design_output_dir}/{top_module}_mapped_withbuf.blif
+        # Reuse earlier results when the script, Verilog, Liberty and top module are unchanged.
+        # Entries are published atomically with features.json last, so a readable
+        # features.json marks a complete entry
+        cache_path = os.path.join(self.cache_dir, self.get_cache_key(verilog_file, liberty_file, top_module))
+        cached_features_file = os.path.join(cache_path, 'features.json')
+        cached_netlist_file = os.path.join(cache_path, f'{top_module}_netlist.v')
+        if not self.emit_artifacts or os.path.exists(cached_netlist_file):
+            features = self.load_cached_features(cached_features_file)
+            if features is not None:
+                features.design_name = design_name
+                self.link_cached_outputs(cache_path, design_output_dir)
+                print(f"Using cached synthesis results for {design_name} from {cache_path}")
+                return features
+
+        # Each run writes into a private staging directory, so parallel runs of
+        # identical designs never write the same files at once
+        os.makedirs(self.cache_dir, exist_ok=True)
+        staging_dir = tempfile.mkdtemp(prefix='.staging-', dir=self.cache_dir)
 
-            # Show design
-            show -stretch -prefix {design_output_dir}/{top_module}_diagram
-            """
-            tmp.write(yosys_script)
-            script_path = tmp.name
+        # Create Yosys script
+        script_args = dict(liberty_file=liberty_file, verilog_file=verilog_file,
+                           top_module=top_module, output_dir=staging_dir)
+        yosys_script = self.YOSYS_SCRIPT.format(**script_args)
+        if self.emit_artifacts:
+            yosys_script += self.YOSYS_ARTIFACT_SCRIPT.format(**script_args)
 
         try:
-            # Run Yosys
-            result = subprocess.run(['yosys', script_path], 
+            # Run Yosys, feeding the script on stdin. Reading it with -s keeps
+            # script semantics, so a failing command aborts with a non-zero exit
+            # instead of being skipped as in the interactive shell
+            yosys_cmd = ['yosys', '-Q', '-s', '/dev/stdin']
+            result = subprocess.run(yosys_cmd,
+                                 input=yosys_script,
                                  capture_output=True, 
                                  text=True,
                                  check=True)
             
             # Parse Yosys output
             output = result.stdout
+
+            # Never trust (or cache) a run that reported an error
+            error_match = self.YOSYS_ERROR_RE.search(output)
+            if error_match:
+                raise subprocess.CalledProcessError(1, yosys_cmd, output=output,
+                                                    stderr=error_match.group(0))
             
             # Initialize features for this design
-            self.all_features[design_name] = self.feature_template.copy()
-            self.all_features[design_name]['design_name'] = design_name
+            features = DesignFeatures(design_name=design_name)
             
-            # Extract basic features
-            gate_match = re.search(r'Number of cells:\s+(\d+)', output)
-            wire_match = re.search(r'Number of wires:\s+(\d+)', output)
-            mem_match = re.search(r'Memory bits:\s+(\d+)', output)
-
-            if gate_match:
-                self.all_features[design_name]['gate_count'] = int(gate_match.group(1))
-            if wire_match:
-                self.all_features[design_name]['total_wire_length'] = int(wire_match.group(1))
-            if mem_match:
-                self.all_features[design_name]['memory_bits'] = int(mem_match.group(1))
-
-            # Extract area information
-            chip_area_match = re.search(r'Chip area for top module.*?:\s*([\d.]+)', output)
-            comb_area_match = re.search(r'Combinational area:\s*([\d.]+)', output)
-            noncomb_area_match = re.search(r'Noncombinational area:\s*([\d.]+)', output)
-            buf_inv_match = re.search(r'Buf/Inv area:\s*([\d.]+)', output)
-            total_area_match = re.search(r'Total cell area:\s*([\d.]+)', output)
-
-            if chip_area_match:
-                self.all_features[design_name]['chip_area'] = float(chip_area_match.group(1))
-            if comb_area_match:
-                self.all_features[design_name]['combinational_area'] = float(comb_area_match.group(1))
-            if noncomb_area_match:
-                self.all_features[design_name]['noncombinational_area'] = float(noncomb_area_match.group(1))
-            if buf_inv_match:
-                self.all_features[design_name]['buf_inv_area'] = float(buf_inv_match.group(1))
-            if total_area_match:
-                self.all_features[design_name]['total_cell_area'] = float(total_area_match.group(1))
-
-            # Save Yosys log
-            with open(f'{design_output_dir}/yosys_log.txt', 'w') as f:
-                f.write(output)
-
-            print(f"\nFeatures extracted for {design_name}:")
-            print(f"  Gate Count: {self.all_features[design_name]['gate_count']}")
-            print(f"  Wire Length: {self.all_features[design_name]['total_wire_length']}")
-            print(f"  Memory Bits: {self.all_features[design_name]['memory_bits']}")
-            print(f"  Chip Area: {self.all_features[design_name]['chip_area']}")
-            print(f"  Total Cell Area: {self.all_features[design_name]['total_cell_area']}")
+            # Extract basic and area features in a single pass over the log,
+            # keeping the first occurrence of each value like re.search would
+            seen = set()
+            for match in self.YOSYS_STAT_RE.finditer(output):
+                key = match.lastgroup
+                if key not in seen:
+                    seen.add(key)
+                    setattr(features, key, type(getattr(features, key))(match.group(key)))
+
+            # Save Yosys log and features to the cache, then link them into the output directory
+            fd = os.open(f'{staging_dir}/yosys_log.txt', os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                # os.write may write fewer bytes than requested, so loop until done
+                remaining = memoryview(output.encode('utf-8', 'replace'))
+                while remaining:
+                    remaining = remaining[os.write(fd, remaining):]
+            finally:
+                os.close(fd)
+            # Only cache runs whose stat report was found, so a bad run is retried next time
+            if seen:
+                with open(f'{staging_dir}/features.json', 'w') as f:
+                    json.dump(asdict(features), f, indent=2)
+            else:
+                print(f"Warning: no statistics found in Yosys output for {design_name}; "
+                      f"result not cached")
+            self.publish_cache_entry(staging_dir, cache_path)
+            self.link_cached_outputs(cache_path, design_output_dir)
+
+            # Report in a single write so output from parallel workers does not interleave
+            sys.stdout.write("\n".join([
+                f"\nFeatures extracted for {design_name}:",
+                f"  Gate Count: {features.gate_count}",
+                f"  Wire Length: {features.total_wire_length}",
+                f"  Memory Bits: {features.memory_bits}",
+                f"  Chip Area: {features.chip_area}",
+                f"  Total Cell Area: {features.total_cell_area}",
+            ]) + "\n")
+
+            return features
             
         except subprocess.CalledProcessError as e:
             print(f"Error running Yosys for {design_name}: {e}")
             print(f"Yosys stderr: {e.stderr}")
             raise
         finally:
-            os.unlink(script_path)
+            shutil.rmtree(staging_dir, ignore_errors=True)
 
     def extract_lef_features(self, lef_file):
         """Extract features from LEF file"""
         print("\nProcessing LEF file...")
         
         try:
-            with open(lef_file, 'r') as f:
-                content = f.read()
-            
-            # Extract features
-            std_cells = re.findall(r'MACRO\s+\w+_\d+X\d+', content)
-            all_macros = re.findall(r'MACRO\s+(\w+)', content)
-            metal_layers = re.findall(r'LAYER\s+metal\d+', content)
+            # Extract features with running counters instead of match lists
+            std_cells = all_macros = metal_layers = 0
+            with map_file(lef_file) as content:
+                for match in self.LEF_RE.finditer(content):
+                    macro = match.group('macro')
+                    if macro is None:
+                        metal_layers += 1
+                    else:
+                        all_macros += 1
+                        if self.STD_CELL_NAME_RE.match(macro):
+                            std_cells += 1
 
             # Add LEF features to all designs
-            for design_name in self.all_features:
-                self.all_features[design_name]['standard_cells_count'] = len(std_cells)
-                self.all_features[design_name]['macro_count'] = len(all_macros) - len(std_cells)
-                self.all_features[design_name]['metal_layers'] = len(metal_layers)
+            for features in self.all_features.values():
+                features.standard_cells_count = std_cells
+                features.macro_count = all_macros - std_cells
+                features.metal_layers = metal_layers
 
             print("LEF features extracted and applied to all designs:")
-            print(f"  Standard Cells: {len(std_cells)}")
-            print(f"  Macros: {len(all_macros) - len(std_cells)}")
-            print(f"  Metal Layers: {len(metal_layers)}")
+            print(f"  Standard Cells: {std_cells}")
+            print(f"  Macros: {all_macros - std_cells}")
+            print(f"  Metal Layers: {metal_layers}")
             
         except Exception as e:
             print(f"Error processing LEF file: {e}")
@@ -220,26 +403,27 @@ class MultiDesignFeatureExtractor:
         print("\nProcessing Liberty file...")
         
         try:
-            with open(lib_file, 'r') as f:
-                content = f.read()
-            
             # Extract features
-            io_pads = re.findall(r'cell\s*\(\s*\w*pad\w*\s*\)', content)
-            power_match = re.search(r'power_domains\s*:\s*(\d+)', content)
-            voltage_match = re.search(r'voltage_domains\s*:\s*(\d+)', content)
+            with map_file(lib_file) as content:
+                io_pads = sum(1 for _ in self.IO_PAD_RE.finditer(content))
+                power_match = self.POWER_DOMAINS_RE.search(content)
+                voltage_match = self.VOLTAGE_DOMAINS_RE.search(content)
+                # Convert while the mapping is still open
+                power_domains = int(power_match.group(1)) if power_match else None
+                voltage_domains = int(voltage_match.group(1)) if voltage_match else None
 
             # Add Liberty features to all designs
-            for design_name in self.all_features:
-                self.all_features[design_name]['io_pad_count'] = len(io_pads)
-                if power_match:
-                    self.all_features[design_name]['power_domains'] = int(power_match.group(1))
-                if voltage_match:
-                    self.all_features[design_name]['voltage_domains'] = int(voltage_match.group(1))
+            for features in self.all_features.values():
+                features.io_pad_count = io_pads
+                if power_domains is not None:
+                    features.power_domains = power_domains
+                if voltage_domains is not None:
+                    features.voltage_domains = voltage_domains
 
             print("Liberty features extracted and applied to all designs:")
-            print(f"  I/O Pads: {len(io_pads)}")
-            print(f"  Power Domains: {1 if not power_match else int(power_match.group(1))}")
-            print(f"  Voltage Domains: {1 if not voltage_match else int(voltage_match.group(1))}")
+            print(f"  I/O Pads: {io_pads}")
+            print(f"  Power Domains: {1 if power_domains is None else power_domains}")
+            print(f"  Voltage Domains: {1 if voltage_domains is None else voltage_domains}")
             
         except Exception as e:
             print(f"Error processing Liberty file: {e}")
@@ -255,23 +439,48 @@ def main():
         # Get initial inputs
         num_designs, liberty_file, lef_file = extractor.get_initial_inputs()
         
-        # Process each design
-        for i in range(1, num_designs + 1):
-            verilog_file, top_module, design_name = extractor.get_design_inputs(i)
-            extractor.run_yosys_analysis(verilog_file, liberty_file, top_module, design_name)
+        # Collect all design inputs before starting synthesis
+        designs = [extractor.get_design_inputs(i) for i in range(1, num_designs + 1)]
+
+        # Design names come from the Verilog basename and key both all_features and
+        # output/<design_name>/, so parallel runs must not share one
+        design_names = [design_name for _, _, design_name in designs]
+        duplicates = sorted({name for name in design_names if design_names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Duplicate design names: {', '.join(duplicates)}. "
+                             f"Each Verilog file must have a unique base name.")
+
+        # Designs are independent, so run one Yosys process per design in parallel
+        max_workers = max(1, (os.cpu_count() or 2) // 2)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(extractor.run_yosys_analysis,
+                                verilog_file, liberty_file, top_module, design_name): design_name
+                for verilog_file, top_module, design_name in designs
+            }
+            # Collect in submission order so the JSON keeps the input design order
+            for future, design_name in futures.items():
+                extractor.all_features[design_name] = future.result()
         
         # Extract common features
         extractor.extract_lef_features(lef_file)
         extractor.extract_lib_features(liberty_file)
         
         # Save all features to JSON
-        with open('output/all_design_features.json', 'w') as f:
-            json.dump(extractor.all_features, f, indent=2)
+        if orjson is not None:
+            with open('output/all_design_features.json', 'wb') as f:
+                f.write(orjson.dumps(extractor.all_features,
+                                     option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_DATACLASS))
+        else:
+            with open('output/all_design_features.json', 'w') as f:
+                json.dump({name: asdict(features) for name, features in extractor.all_features.items()},
+                          f, indent=2)
         
         print("\nAll features extracted successfully!")
         print("Results saved in 'output' directory:")
         print("  - all_design_features.json: Combined features for all designs")
         print("  - [design_name]/: Separate directory for each design's outputs")
+        print(f"Synthesis results are cached in '{extractor.cache_dir}' and reused for unchanged designs")
         
     except Exception as e:
         print(f"\nError during feature extraction: {e}")